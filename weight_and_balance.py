@@ -1,13 +1,9 @@
 import json
 import os
 import sys
-from collections import defaultdict
 from datetime import datetime
-
-import numpy as np
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfbase.pdfmetrics import stringWidth
-from reportlab.pdfgen import canvas
+from functools import lru_cache
+from types import MappingProxyType
 
 # Conversion constants
 IN2CM = 2.54
@@ -30,106 +26,158 @@ class CALLSIGNS:
     DEXBS = "D-EXBS"
     DMSDK = "D-MSDK"
 
+def _totals(
+    rows: list,
+    arms: dict,
+    with_fuel: bool = True,
+    total_weight: float = 0.0,
+    total_moment: float = 0.0,
+) -> tuple:
+    """Add the weight and moment of (station, name, weight_kg) rows, in one pass."""
+    if not with_fuel:
+        rows = (row for row in rows if row[0] != STATIONS.FUEL)
+    for station, _, weight in rows:
+        total_weight += weight
+        total_moment += weight * arms[station]
+    return total_weight, total_moment
+
+
+def _cog(total_weight: float, total_moment: float) -> float:
+    """Center of gravity from total weight and moment."""
+    return round(total_moment / total_weight, 2)
+
+
 class WeightAndBalance:
     def load(self, weight_kg: float, station: str, name: str) -> None:
         """Put a load into the plane at the specified station."""
-        self.loading[station][name.capitalize()] = weight_kg
+        self._put(station, name.capitalize(), weight_kg)
 
     def fuel(self, liters: float) -> None:
         """Add fuel to the plane."""
-        self.loading[STATIONS.FUEL]["Fuel"] = liters * KG100LL
+        self._put(STATIONS.FUEL, "Fuel", liters * KG100LL)
+
+    def _init_loading(self) -> None:
+        """Start with an empty plane."""
+        self._rows = []  # (station, name, weight_kg) in load order
+        self._index = {}  # (station, name) -> position in self._rows
+        self._loading = {}  # station -> {name: weight_kg}, kept in step with _rows
+        self._loading_views = {}  # station -> read-only view of self._loading[station]
+
+    def _put(self, station: str, name: str, weight_kg: float) -> None:
+        """Add a row, replacing any existing load with the same station and name."""
+        i = self._index.get((station, name))
+        if i is None:
+            self._index[(station, name)] = len(self._rows)
+            self._rows.append((station, name, weight_kg))
+        else:
+            self._rows[i] = (station, name, weight_kg)
+        if station not in self._loading:
+            self._loading[station] = {}
+            self._loading_views[station] = MappingProxyType(self._loading[station])
+        self._loading[station][name] = weight_kg
+
+    @property
+    def loading(self) -> MappingProxyType:
+        """Read-only view of the loads grouped by station, in the order first loaded.
+
+        Use `load` and `fuel` to change the loading.
+        """
+        return MappingProxyType(self._loading_views)
+
+    def totals(self, with_fuel: bool = True) -> tuple:
+        """Total weight and total moment."""
+        total_weight, total_moment = _totals(
+            self._rows, self.arms, with_fuel, self.empty_mass_kg, self.empty_moment
+        )
+        return round(total_weight, 2), round(total_moment, 2)
 
     def total_weight(self, with_fuel: bool = True) -> float:
         """Total weight."""
-        total_weight = self.empty_mass_kg
-        for station, weights in self.loading.items():
-            if station == STATIONS.FUEL and not with_fuel:
-                continue
-            total_weight += np.sum(np.array(list(weights.values())))
-        return round(total_weight, 2)
+        return self.totals(with_fuel)[0]
 
     def total_moment(self, with_fuel: bool = True) -> float:
         """Total moment"""
-        total_moment = self.empty_moment
-        for station, arm in self.arms.items():
-            if station == STATIONS.FUEL and not with_fuel:
-                continue
-            weight = self.loading.get(station, {})
-            total_moment += np.sum(np.array(list(weight.values())) * arm)
-        return round(total_moment, 2)
+        return self.totals(with_fuel)[1]
 
     def CoG(self, with_fuel: bool = True) -> float:
         """Center of gravity."""
-        return round(self.total_moment(with_fuel) / self.total_weight(with_fuel), 2)
+        return _cog(*self.totals(with_fuel))
 
 
 class C172S_WB(WeightAndBalance):
     """Weight and balance calculator for the Cessna 172S."""
 
+    # Empty mass (kg), empty arm (cm) and weighing date per callsign
+    _SPECS = {
+        CALLSIGNS.DEXBS: (773.16, 101.62, datetime(2017, 5, 18)),  # 78572.54 in the book
+        CALLSIGNS.DEXAV: (749, 106.805, datetime(2022, 5, 10)),  # 79997.00 in the book
+    }
+
+    # From Cessna 172S POH; shared by all instances and never mutated
+    _ARMS = {
+        STATIONS.FRONT_SEATS: 37 * IN2CM,
+        STATIONS.BACK_SEATS: 73 * IN2CM,
+        STATIONS.FRONT_BAGGAGE: 95 * IN2CM,
+        STATIONS.BACK_BAGGAGE: 123 * IN2CM,
+        STATIONS.FUEL: 48 * IN2CM,
+    }
+
     def __init__(self, callsign: str):
-        if callsign == CALLSIGNS.DEXBS:
-            self.empty_mass_kg = 773.16
-            self.empty_arm_cm = 101.62
-            self.empty_moment = round(
-                self.empty_mass_kg * self.empty_arm_cm, 2  # 78572.54 in the book
-            )
-            self.date = datetime(2017, 5, 18)
-        elif callsign == CALLSIGNS.DEXAV:
-            self.empty_mass_kg = 749
-            self.empty_arm_cm = 106.805
-            self.empty_moment = round(
-                self.empty_mass_kg * self.empty_arm_cm, 2  # 79997.00 in the book
-            )
-            self.date = datetime(2022, 5, 10)
-        else:
-            raise ValueError("Double check callsign")
+        try:
+            self.empty_mass_kg, self.empty_arm_cm, self.date = self._SPECS[callsign]
+        except KeyError:
+            raise ValueError("Double check callsign") from None
+        self.empty_moment = round(self.empty_mass_kg * self.empty_arm_cm, 2)
 
         self.callsign = callsign
         self.type = "Cessna 172S"
+        self.arms = self._ARMS
 
-        # From Cessna 172S POH
-        self.arms = {
-            STATIONS.FRONT_SEATS: 37 * IN2CM,
-            STATIONS.BACK_SEATS: 73 * IN2CM,
-            STATIONS.FRONT_BAGGAGE: 95 * IN2CM,
-            STATIONS.BACK_BAGGAGE: 123 * IN2CM,
-            STATIONS.FUEL: 48 * IN2CM,
-        }
-
-        self.loading = defaultdict(dict)
+        self._init_loading()
 
 class BreezerC_WB(WeightAndBalance):
     """Weight and balance calculator for the Breezer C."""
 
+    # Empty mass (kg), empty arm (cm) and weighing date per callsign
+    _SPECS = {
+        CALLSIGNS.DMSDK: (298.2, 29.4, datetime(2010, 9, 1)),  # date estimated
+    }
+
+    # From Breezer C POH; shared by all instances and never mutated
+    _ARMS = {
+        STATIONS.FRONT_SEATS: 67.3,
+        STATIONS.BAGGAGE: 153,
+        STATIONS.FUEL: -18.5,  # is in front of reference point!
+    }
+
     def __init__(self, callsign: str):
-        if callsign == CALLSIGNS.DMSDK:
-            self.empty_mass_kg = 298.2
-            self.empty_arm_cm = 29.4
-            self.empty_moment = round(
-                self.empty_mass_kg * self.empty_arm_cm, 2
-            )
-            self.date = datetime(2010, 9, 1)  # estimated
-        else:
-            raise ValueError("Double check callsign")
+        try:
+            self.empty_mass_kg, self.empty_arm_cm, self.date = self._SPECS[callsign]
+        except KeyError:
+            raise ValueError("Double check callsign") from None
+        self.empty_moment = round(self.empty_mass_kg * self.empty_arm_cm, 2)
 
         self.callsign = callsign
         self.type = "Breezer C"
+        self.arms = self._ARMS
+
+        self._init_loading()
+
 
-        # From Breezer C POH
-        self.arms = {
-            STATIONS.FRONT_SEATS: 67.3,
-            STATIONS.BAGGAGE: 153,
-            STATIONS.FUEL: -18.5,  # is in front of reference point!
-        }
 
-        self.loading = defaultdict(dict)
 
+@lru_cache(maxsize=512)
+def _sw(text: str, font: str, fontsize: float) -> float:
+    """Cached stringWidth; the layout measures the same few strings repeatedly."""
+    # reportlab is imported lazily so the CLI starts fast when there is no config
+    from reportlab.pdfbase.pdfmetrics import stringWidth
 
+    return stringWidth(text, font, fontsize)
 
 
 def _underline(pdf, x: float, y: float, text: str, font, fontsize) -> None:
     """Underline the given text and write."""
-    linelength = stringWidth(text, font, fontsize)
+    linelength = _sw(text, font, fontsize)
     pdf.drawString(x, y, text)
     pdf.line(x, y - 2, x + linelength, y - 2)
 
@@ -139,17 +187,25 @@ def _sanitize_station(station: str) -> str:
     return station.replace("_", " ").capitalize()
 
 
-def _map2range(
-    graph_val: float, max_graph: float, min_graph: float, max_px: float, min_px: float
-) -> float:
-    """Map from one range to another."""
-    graph_range = max_graph - min_graph
-    px_range = max_px - min_px
-    return (((graph_val - min_graph) * px_range) / graph_range) + min_px
+# Human readable names of all known stations
+_PRETTY = {
+    v: _sanitize_station(v) for k, v in vars(STATIONS).items() if not k.startswith("_")
+}
+
+
+@lru_cache(maxsize=1)
+def _c172s_graph():
+    """C172S W&B chart, read once per process and reused for every pdf."""
+    from reportlab.lib.utils import ImageReader
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    return ImageReader(os.path.join(here, "wb_c172s.png"))
 
 
 def create_pdf(plane: WeightAndBalance):
     """Create weight and balance pdf."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
 
     # Base constants to control how the pdf looks and behaves
     font = "Courier"
@@ -159,18 +215,21 @@ def create_pdf(plane: WeightAndBalance):
     header_new_line = 20
     start_height = 780
 
-    filedate = datetime.today().strftime("%y%m%d")
+    now = datetime.today()
+    filedate = now.strftime("%y%m%d")
+    date = now.strftime("%d/%m/%y")
+    weighing = plane.date.strftime("%d/%m/%y")
     pdf = canvas.Canvas(
         f"{filedate}_{plane.callsign}_weight_and_balance.pdf", pagesize=A4
     )
+    pdf.setTitle(f"{plane.callsign} Weight and Balance")
     pdf.setLineWidth(0.3)
     pdf.setFont("Helvetica", fontsize)
 
     # Draw the header
-    date = datetime.today().strftime("%d/%m/%y")
     pdf.drawString(30, start_height, "Weight and Balance", mode=1)
     pdf.drawString(30, start_height - header_new_line, plane.type)
-    date_width = stringWidth(date, font, fontsize)
+    date_width = _sw(date, font, fontsize)
     pdf.drawString(500, start_height, date)
     pdf.line(  # line across the entire page
         30,
@@ -184,17 +243,17 @@ def create_pdf(plane: WeightAndBalance):
     start = start_height - header_new_line - 5 - header_new_line
     pdf.drawString(30, start, f"Aircraft: {plane.callsign}")
     start -= header_new_line
-    pdf.drawString(30, start, f"Weighing Date: {plane.date.strftime('%d/%m/%y')}")
+    pdf.drawString(30, start, f"Weighing Date: {weighing}")
 
     # Create some offsets so text is aligned
     weight_x = 170  # weight x offset
     arm_x = 310  # arm x offset
     moment_x = 420  # moment x offset
-    weight_right_offset = stringWidth("Empty Weight", font, fontsize)
+    weight_right_offset = _sw("Empty Weight", font, fontsize)
     # A bigger placeholder arm which should be long enough to encompass other arms,
     # so that they are all aligned
-    arm_right_offset = stringWidth("106.805 cm", font, fontsize)
-    moment_right_offset = stringWidth("Momentx", font, fontsize)  # same as above
+    arm_right_offset = _sw("106.805 cm", font, fontsize)
+    moment_right_offset = _sw("Momentx", font, fontsize)  # same as above
     x = (arm_x + weight_x + weight_right_offset) // 2  # multiply symbol position
     eq = moment_x - 20  # equal symbol position
 
@@ -219,52 +278,57 @@ def create_pdf(plane: WeightAndBalance):
     pdf.setFont(font, fontsize)
     start -= newline
     for station, weights in plane.loading.items():
-        arm = plane.arms[station]
-        station = _sanitize_station(station)
-        pdf.drawString(weight_x // 2, start, station)
+        # The arm is the same for every item at a station
+        arm_r = round(plane.arms[station], 2)
+        arm_str = f"{arm_r} cm"
+        pdf.drawString(weight_x // 2, start, _PRETTY[station])
         for name, weight in weights.items():
             weight = round(weight, 2)
-            arm = round(arm, 2)
             start -= newline
             pdf.drawString(weight_x // 2, start, f"  – {name}")
             pdf.drawRightString(weight_x + weight_right_offset, start, f"{weight} kg")
             pdf.drawString(x, start, "x")
-            pdf.drawRightString(arm_x + arm_right_offset, start, f"{arm} cm")
+            pdf.drawRightString(arm_x + arm_right_offset, start, arm_str)
             pdf.drawString(eq, start, "=")
             pdf.drawRightString(
-                moment_x + moment_right_offset, start, str(round(weight * arm, 2))
+                moment_x + moment_right_offset, start, str(round(weight * arm_r, 2))
             )
         start -= newline + 10
 
+    # Same numbers as total_weight/total_moment/CoG, computed once per pdf
+    weight_full, moment_full = plane.totals()
+    weight_dry, moment_dry = plane.totals(with_fuel=False)
+    cog_full = _cog(weight_full, moment_full)
+    cog_dry = _cog(weight_dry, moment_dry)
+
     # Write the totals at the bottom
     pdf.setFont("Helvetica-Bold", fontsize)
     pdf.drawString(weight_x // 2, start, "Totals")
     pdf.line(
         weight_x // 2,
         start - 2,
-        moment_x + stringWidth("Moment", font, fontsize),
+        moment_x + _sw("Moment", font, fontsize),
         start - 2,
     )
     pdf.setFont(font, fontsize)
     start -= newline
-    weight_text = f"Weight: {plane.total_weight()} kg"
+    weight_text = f"Weight: {weight_full} kg"
     pdf.drawRightString(
         weight_x + weight_right_offset, start, weight_text
     )
     pdf.drawRightString(
-        moment_x + moment_right_offset, start, f"Moment: {plane.total_moment()}"
+        moment_x + moment_right_offset, start, f"Moment: {moment_full}"
     )
     start -= newline
-    weight_text_offset = stringWidth(weight_text, font, fontsize)
+    weight_text_offset = _sw(weight_text, font, fontsize)
     pdf.drawCentredString(weight_x + weight_text_offset, start, # This may be incorrect, but looks fine for now
-                          f"CoG: {plane.CoG()} (empty: {plane.CoG(False)})")
+                          f"CoG: {cog_full} (empty: {cog_dry})")
 
     if plane.type == "Cessna 172S":
         # Add the graph
-        graph_path = "./wb_c172s.png"
         scale = 2.3  # scale of the image; DO NOT CHANGE THIS otherwise the lines will be broken!
         pdf.drawImage(
-            graph_path,
+            _c172s_graph(),
             width // 2,  # DO NOT CHANGE THIS
             start - 190,  # DO NOT CHANGE THIS
             width=width // scale,
@@ -276,6 +340,12 @@ def create_pdf(plane: WeightAndBalance):
         # Draw lines onto the chart
         # This works by mapping a high and low value on the chart to their
         # corresponding high and low values in pixels, then mapping between the two.
+        # Both lines use the same two mappings, so fold each into a scale and bias.
+        cog_scale = (384.25 - 212) / (1225 - 875)
+        cog_bias = 212 - 875 * cog_scale
+        w_scale = (49.75 - 275) / (1050 - 650)
+        w_bias = 275 - 650 * w_scale
+
         def CoG_horizontal_line_height(val):
             """Get the pixel height of the line, in relation to how far down it is in the *image*."""
             return start - val
@@ -284,9 +354,9 @@ def create_pdf(plane: WeightAndBalance):
         pdf.setStrokeColor("black")
         pdf.setLineWidth(1.25)
         start -= 50  # should put a little nub into the x axis ticks above
-        vert = _map2range(plane.CoG() * CM2MM, 1225, 875, 384.25, 212)
+        vert = cog_full * CM2MM * cog_scale + cog_bias
         pdf.line(vert, start, vert, start - 285)
-        h_factor = _map2range(plane.total_weight(), 1050, 650, 49.75, 275)
+        h_factor = weight_full * w_scale + w_bias
         pdf.line(
             200,
             CoG_horizontal_line_height(h_factor),
@@ -296,9 +366,9 @@ def create_pdf(plane: WeightAndBalance):
 
         # Without fuel
         pdf.setStrokeColor("red")
-        vert = _map2range(plane.CoG(with_fuel=False) * CM2MM, 1225, 875, 384.25, 212)
+        vert = cog_dry * CM2MM * cog_scale + cog_bias
         pdf.line(vert, start, vert, start - 285)
-        h_factor = _map2range(plane.total_weight(with_fuel=False), 1050, 650, 49.75, 275)
+        h_factor = weight_dry * w_scale + w_bias
         pdf.line(
             200,
             CoG_horizontal_line_height(h_factor),
@@ -311,7 +381,7 @@ def create_pdf(plane: WeightAndBalance):
         pdf.setFillColorRGB(1, 0, 0)
         disclaimer_fontsize = fontsize / 2
         pdf.setFont("Helvetica", disclaimer_fontsize)
-        label_width = stringWidth("Red line", "Helvetica", disclaimer_fontsize)
+        label_width = _sw("Red line", "Helvetica", disclaimer_fontsize)
         pdf.drawString(50, start, "Red line")
         pdf.setFillColorRGB(0, 0, 0)
         pdf.drawString(50 + label_width, start, ": no usable fuel")